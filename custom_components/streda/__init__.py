@@ -1,20 +1,22 @@
 """The streda Lights integration."""
 
+import asyncio
 import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.event import async_track_time_interval
-from datetime import timedelta
+from homeassistant.helpers.event import async_call_later
 
 from .api import StredaApiClient
 from .const import (
     CONF_REFRESH_TOKEN,
     CONF_LOCATION_ID,
+    CONF_DISCOVERY_CACHE,
     FALLBACK_DATA_POLL_INTERVAL,
-    ACCESS_TOKEN_VALIDITY_CHECK_INTERVAL,
+    MIN_TOKEN_REFRESH_DELAY,
+    TOKEN_REFRESH_MARGIN,
     DOMAIN,
 )
 from .coordinator import DataCoordinator
@@ -43,35 +45,91 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry, data={**entry.data, CONF_REFRESH_TOKEN: new_refresh_token}
         )
 
+    # Function for saving the discovery responses and their ETags
+    async def save_discovery_cache(discovery_cache: dict):
+        """Update the discovery cache in the config entry options."""
+        _LOGGER.debug("Updating stored discovery cache")
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, CONF_DISCOVERY_CACHE: discovery_cache}
+        )
+
+    # One-shot timer that refreshes the tokens shortly before they expire
+    cancel_refresh = None
+    unloaded = False
+
+    @callback
+    def schedule_token_refresh(expires_in: float) -> None:
+        """(Re)schedule the token refresh for a token valid for expires_in seconds."""
+        nonlocal cancel_refresh
+        # A refresh still running during unload must not start a new timer
+        if unloaded:
+            return
+        if cancel_refresh:
+            cancel_refresh()
+        delay = max(MIN_TOKEN_REFRESH_DELAY, expires_in - TOKEN_REFRESH_MARGIN)
+        _LOGGER.debug("Next token refresh in %d seconds", delay)
+        cancel_refresh = async_call_later(hass, delay, _check_tokens)
+
+    @callback
+    def cancel_token_refresh() -> None:
+        """Cancel the pending token refresh for good."""
+        nonlocal cancel_refresh, unloaded
+        unloaded = True
+        if cancel_refresh:
+            cancel_refresh()
+            cancel_refresh = None
+
+    # Also covers a setup that fails after the first authentication
+    entry.async_on_unload(cancel_token_refresh)
+
     api_client = StredaApiClient(
-        refresh_token, location_id, session, save_token_to_disk
+        refresh_token,
+        location_id,
+        session,
+        save_token_to_disk,
+        schedule_token_refresh,
+        entry.options.get(CONF_DISCOVERY_CACHE),
+        save_discovery_cache,
     )
 
-    # 🔍 One-time system discovery
-    system = await api_client.discover_system()
-
     # Create coordinators
     data_coordinator = DataCoordinator(
         hass, api_client, location_id, FALLBACK_DATA_POLL_INTERVAL
     )
 
-    # Periodic token validity check
+    # Token refresh, scheduled by the API client after every authentication
     async def _check_tokens(now):
+        nonlocal cancel_refresh
+        cancel_refresh = None
+        # Refreshed in the meantime, that refresh scheduled the next one
+        if await api_client.verify_token_validity():
+            return
+
         try:
-            tokens_refreshed = await api_client.reauthenticate_if_needed()
-            if tokens_refreshed:
+            # Keep the current SignalR connection until new tokens are in,
+            # a failed refresh would reconnect with the old token anyway
+            if await api_client.reauthenticate_if_needed():
                 await data_coordinator._reconnect_signalr()
         except Exception as err:
             _LOGGER.error("Error refreshing tokens: %s", err)
-
-    async_track_time_interval(
-        hass,
-        _check_tokens,
-        timedelta(seconds=ACCESS_TOKEN_VALIDITY_CHECK_INTERVAL),
+        finally:
+            # A failed refresh schedules nothing, retry shortly instead
+            if cancel_refresh is None:
+                schedule_token_refresh(0)
+
+    # Warm up connections to the API hosts while the B2C authentication runs,
+    # without holding up setup
+    hass.async_create_background_task(
+        api_client.warm_connections(), f"{DOMAIN} connection warm-up"
     )
 
-    # Fetch initial data
-    await data_coordinator.async_config_entry_first_refresh()
+    # Authenticate once, then run the one-time system discovery and the
+    # initial data fetch side by side
+    await api_client.reauthenticate_if_needed()
+    system, _ = await asyncio.gather(
+        api_client.discover_system(),
+        data_coordinator.async_config_entry_first_refresh(),
+    )
 
     # Store global data
     hass.data[DOMAIN][entry.entry_id] = {
@@ -91,7 +149,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
     data_coordinator = hass.data[DOMAIN][entry.entry_id]["data_coordinator"]
-    await data_coordinator.async_stop_signalr()
+    await data_coordinator.async_shutdown()
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
@@ -2,22 +2,40 @@
 
 import asyncio
 import logging
+import random
 import aiohttp
-import async_timeout
 from datetime import datetime, timedelta, timezone
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson ships with Home Assistant, but stay portable
+    from json import loads as json_loads
 
 from .const import (
     STREDA_AUTHENTICATION_API_URL,
     CLIENT_ID,
+    MAX_CONCURRENT_REQUESTS,
     STREDA_B2C_TOKEN_URL,
     STREDA_DATA_API_URL,
     STREDA_SIGNALR_NEGOTIATE_URL,
+    TOKEN_REFRESH_MARGIN,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
 
+async def _get_json(response: aiohttp.ClientResponse):
+    """Decode a JSON response body as UTF-8, skipping charset detection."""
+    return json_loads(await response.read())
+
+
+# Pre-serialized toggle request, formatted with the device and dock number
+_TOGGLE_TEMPLATE = (
+    '{"action":"ActionSwitch","actionParameters":{"switchAction":"TOGGLE"},'
+    '"targetDevice":{"deviceNumber":%d,"dockNumber":"%s"}}'
+)
+
+
 class StredaApiClient:
     """API client for communicating with streda provider."""
 
@@ -27,72 +45,129 @@ class StredaApiClient:
         location_id: str,
         session: aiohttp.ClientSession,
         token_update_callback: callable = None,
+        schedule_refresh: callable = None,
+        discovery_cache: dict | None = None,
+        discovery_cache_callback: callable = None,
     ):
         """Initialize the API client."""
         _LOGGER.info("Initializing StredaApiClient, %s", location_id)
 
         self._refresh_token = refresh_token
         self._token_update_callback = token_update_callback
+        self._schedule_refresh = schedule_refresh
+        self._discovery_cache = discovery_cache or {}
+        self._discovery_cache_callback = discovery_cache_callback
         self._location_id = location_id
         self._session = session
+        self._timeout = aiohttp.ClientTimeout(total=10, connect=3, sock_read=8)
+
+        # Location-specific endpoints, fixed for the lifetime of the client
+        self._url_location = f"{STREDA_DATA_API_URL}/Location/{location_id}"
+        self._url_device_states = (
+            f"{STREDA_DATA_API_URL}/DeviceState/{location_id}/deviceStates"
+        )
+        self._url_device_state = (
+            f"{STREDA_DATA_API_URL}/DeviceState/{location_id}/deviceState"
+        )
+        self._url_rooms = f"{STREDA_DATA_API_URL}/Room/{location_id}/getRooms"
+        self._url_docks_template = (
+            f"{STREDA_DATA_API_URL}/Dock/{location_id}/{{room_id}}/getDocks"
+        )
         self._id_token = None
         self._api_token = None
-        self._expiry_date = None
+        self._headers: dict[str, str] = {}
+        self._expiry_date = None  # for logging only
+        self._expiry_monotonic = None
+        self._signalr_access_token = None
+        self._signalr_token_task: asyncio.Future | None = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_inflight: asyncio.Future | None = None
+
+    async def warm_connections(self) -> None:
+        """Open pooled connections to the API hosts ahead of the first requests.
+
+        Only the TCP and TLS setup matters, responses and errors are ignored.
+        The B2C host is left out, the token request to it starts right away.
+        """
+
+        async def probe(url):
+            async with self._session.head(
+                url, allow_redirects=False, timeout=self._timeout
+            ):
+                pass
+
+        await asyncio.gather(
+            probe(STREDA_AUTHENTICATION_API_URL),
+            probe(STREDA_DATA_API_URL),
+            return_exceptions=True,
+        )
 
     async def verify_token_validity(self) -> bool:
         """Verify if the current token is still valid."""
-        if self._expiry_date is None:
+        if self._expiry_monotonic is None:
             return False
-        now = datetime.now(timezone.utc)
-        _LOGGER.debug(
-            "Token expiry date: %s, now: %s, diff: %s",
-            self._expiry_date,
-            now,
-            self._expiry_date - now,
+        # Same margin as the refresh timer, so the token is due when it fires
+        return (
+            asyncio.get_running_loop().time()
+            < self._expiry_monotonic - TOKEN_REFRESH_MARGIN
         )
-        return now < (
-            self._expiry_date - timedelta(hours=1)
-        )  # Consider token invalid if less than 1 hour left
 
     async def reauthenticate_if_needed(self) -> bool:
-        """Re-authenticate if the token is expired or about to expire."""
-        if not await self.verify_token_validity():
-            _LOGGER.debug("Token expired or invalid, re-authenticating")
-            await self.authenticate_b2c()
-            await self.authenticate_api()
-            return True
-        return False
+        """Re-authenticate if the token is expired or about to expire.
+
+        Concurrent callers share the refresh that is already in flight, a
+        second B2C request would invalidate the refresh token of the first.
+        Returns whether new tokens were obtained.
+        """
+        if self._refresh_inflight is None:
+            if await self.verify_token_validity():
+                return False
+            self._refresh_inflight = asyncio.ensure_future(self._refresh_tokens())
+        return await asyncio.shield(self._refresh_inflight)
+
+    async def _refresh_tokens(self) -> bool:
+        """Run the B2C and API authentication chain."""
+        try:
+            async with self._refresh_lock:
+                # The chain may have just run for a caller ahead in the queue
+                if await self.verify_token_validity():
+                    return False
+
+                _LOGGER.debug("Token expired or invalid, re-authenticating")
+                if not (
+                    await self.authenticate_b2c() and await self.authenticate_api()
+                ):
+                    return False
+                # Negotiate in the background, the SignalR connect that follows
+                # a refresh awaits this task instead of negotiating again
+                self._signalr_token_task = asyncio.ensure_future(
+                    self._negotiate_signalr_token()
+                )
+                return True
+        finally:
+            self._refresh_inflight = None
+
+    async def _retry(self, coro_factory, attempts=3, base=1.0, cap=8.0):
+        """Await coro_factory(), retrying transient errors with jittered backoff."""
+        for attempt in range(attempts):
+            try:
+                return await coro_factory()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                # Client errors (e.g. a rejected token) won't fix themselves
+                if attempt == attempts - 1 or (
+                    isinstance(err, aiohttp.ClientResponseError) and err.status < 500
+                ):
+                    raise
+                delay = min(cap, base * 2**attempt) * random.uniform(0.8, 1.2)
+                _LOGGER.debug(
+                    "Request failed: %s, retrying in %.1f seconds", err, delay
+                )
+                await asyncio.sleep(delay)
 
     async def authenticate_b2c(self) -> bool:
         """Authenticate and get id token using refresh token."""
         try:
-            async with async_timeout.timeout(10):
-                url = STREDA_B2C_TOKEN_URL
-
-                payload = {
-                    "client_id": CLIENT_ID,
-                    "refresh_token": self._refresh_token,
-                    "grant_type": "refresh_token",
-                    "scope": f"openid offline_access {CLIENT_ID}",
-                }
-
-                async with self._session.post(url, data=payload) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    self._id_token = data.get("id_token")
-                    self._refresh_token = data.get("refresh_token")
-
-                    # Save the new refresh token
-                    if self._token_update_callback:
-                        await self._token_update_callback(self._refresh_token)
-
-                    if not self._id_token:
-                        _LOGGER.error("No ID token in response")
-                        return False
-
-                    _LOGGER.debug("Successfully authenticated b2c token.")
-                    return True
+            return await self._retry(self._do_authenticate_b2c)
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Authentication failed: %s", err)
@@ -101,30 +176,44 @@ class StredaApiClient:
             _LOGGER.error("Unexpected authentication error: %s", err)
             return False
 
+    async def _do_authenticate_b2c(self) -> bool:
+        """Request a new id token from B2C, raising on request errors."""
+        url = STREDA_B2C_TOKEN_URL
+
+        payload = {
+            "client_id": CLIENT_ID,
+            "refresh_token": self._refresh_token,
+            "grant_type": "refresh_token",
+            "scope": f"openid offline_access {CLIENT_ID}",
+        }
+
+        async with self._session.post(
+            url, data=payload, timeout=self._timeout
+        ) as response:
+            response.raise_for_status()
+            data = await _get_json(response)
+
+            self._id_token = data.get("id_token")
+
+            # Only persist the refresh token when it was rotated, and
+            # keep the current one if the response omits it
+            new_refresh_token = data.get("refresh_token")
+            if new_refresh_token and new_refresh_token != self._refresh_token:
+                self._refresh_token = new_refresh_token
+                if self._token_update_callback:
+                    await self._token_update_callback(self._refresh_token)
+
+            if not self._id_token:
+                _LOGGER.error("No ID token in response")
+                return False
+
+            _LOGGER.debug("Successfully authenticated b2c token.")
+            return True
+
     async def authenticate_api(self) -> bool:
         """Authenticate and get api access token using refresh token."""
         try:
-            async with async_timeout.timeout(10):
-                url = f"{STREDA_AUTHENTICATION_API_URL}/UserAuth/login"
-
-                async with self._session.post(url, json=self._id_token) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    self._api_token = data.get("token")
-
-                    if not self._api_token:
-                        _LOGGER.error("No API token in response")
-                        return False
-
-                    dt = datetime.now(timezone.utc)
-                    dt_plus = dt + timedelta(seconds=data.get("expiresInSeconds", 0))
-                    self._expiry_date = dt_plus
-
-                    _LOGGER.debug(
-                        "Successfully authenticated API token, new expiry: %s",
-                        self._expiry_date,
-                    )
-                    return True
+            return await self._retry(self._do_authenticate_api)
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Authentication failed: %s", err)
@@ -133,24 +222,87 @@ class StredaApiClient:
             _LOGGER.error("Unexpected authentication error: %s", err)
             return False
 
-    async def get_signalr_access_token(self) -> str:
-        """Get SignalR access token using api token."""
-        try:
-            async with async_timeout.timeout(10):
-                negotiate_headers = {"Authorization": f"Bearer {self._api_token}"}
+    async def _do_authenticate_api(self) -> bool:
+        """Exchange the id token for an api token, raising on request errors."""
+        url = f"{STREDA_AUTHENTICATION_API_URL}/UserAuth/login"
 
-                async with self._session.post(
-                    STREDA_SIGNALR_NEGOTIATE_URL, headers=negotiate_headers
-                ) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-                    token = data.get("accessToken")
+        async with self._session.post(
+            url, json=self._id_token, timeout=self._timeout
+        ) as response:
+            response.raise_for_status()
+            data = await _get_json(response)
+            self._api_token = data.get("token")
 
-                    if not token:
-                        _LOGGER.error("No SignalR access token in response")
-                        return False
-                    _LOGGER.debug("Successfully retrieved SignalR access token")
-                    return token
+            if not self._api_token:
+                _LOGGER.error("No API token in response")
+                return False
+
+            # Shared by all requests, treat as read-only
+            self._headers = {
+                "Authorization": f"Bearer {self._api_token}",
+                "Content-Type": "application/json",
+            }
+
+            # A new API token invalidates the negotiated SignalR token
+            self._signalr_access_token = None
+            self._signalr_token_task = None
+
+            # Monotonic expiry keeps the validity check immune to clock jumps
+            expires_in = data.get("expiresInSeconds", 0)
+            self._expiry_monotonic = asyncio.get_running_loop().time() + expires_in
+            self._expiry_date = datetime.now(timezone.utc) + timedelta(
+                seconds=expires_in
+            )
+
+            # Plan the next refresh around the new expiry, on the same clock
+            # as the monotonic expiry
+            if self._schedule_refresh:
+                self._schedule_refresh(expires_in)
+
+            _LOGGER.debug(
+                "Successfully authenticated API token, new expiry: %s",
+                self._expiry_date,
+            )
+            return True
+
+    async def get_signalr_access_token(self) -> str:
+        """Get SignalR access token using api token.
+
+        The token is cached until the next API authentication, so concurrent
+        connects after a refresh share the negotiate started by the refresh.
+        """
+        if self._signalr_access_token:
+            return self._signalr_access_token
+
+        # A finished task without a token failed, negotiate again
+        task = self._signalr_token_task
+        if task is None or task.done():
+            task = self._signalr_token_task = asyncio.ensure_future(
+                self._negotiate_signalr_token()
+            )
+        return await asyncio.shield(task)
+
+    async def _negotiate_signalr_token(self) -> str:
+        """Negotiate a SignalR access token and cache it."""
+        headers = self._headers
+        try:
+            async with self._session.post(
+                STREDA_SIGNALR_NEGOTIATE_URL,
+                headers=headers,
+                timeout=self._timeout,
+            ) as response:
+                response.raise_for_status()
+                data = await _get_json(response)
+                token = data.get("accessToken")
+
+                if not token:
+                    _LOGGER.error("No SignalR access token in response")
+                    return False
+                _LOGGER.debug("Successfully retrieved SignalR access token")
+                # Don't cache a token negotiated with a since replaced API token
+                if headers is self._headers:
+                    self._signalr_access_token = token
+                return token
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Authentication failed: %s", err)
@@ -162,33 +314,26 @@ class StredaApiClient:
     async def verify_access(self) -> bool:
         """Verify user has access to the location."""
         try:
-            # First authenticate to get access token
-            if not await self.authenticate_b2c():
-                return False
-
-            if not await self.authenticate_api():
+            # First authenticate to get access token, sharing a refresh that
+            # is already in flight
+            await self.reauthenticate_if_needed()
+            if not self._api_token:
                 return False
 
-            async with async_timeout.timeout(10):
-                headers = {
-                    "Authorization": f"Bearer {self._api_token}",
-                    "Content-Type": "application/json",
-                }
-
-                # Check if user has access to this location
-                url = f"{STREDA_DATA_API_URL}/Location/{self._location_id}"
-
-                async with self._session.get(url, headers=headers) as response:
-                    if response.status == 404:
-                        _LOGGER.error("Location not found")
-                        return False
-                    elif response.status == 403:
-                        _LOGGER.error("No access to location")
-                        return False
-
-                    response.raise_for_status()
-                    _LOGGER.debug("Successfully verified access to location")
-                    return True
+            # Check if user has access to this location
+            async with self._session.get(
+                self._url_location, headers=self._headers, timeout=self._timeout
+            ) as response:
+                if response.status == 404:
+                    _LOGGER.error("Location not found")
+                    return False
+                elif response.status == 403:
+                    _LOGGER.error("No access to location")
+                    return False
+
+                response.raise_for_status()
+                _LOGGER.debug("Successfully verified access to location")
+                return True
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Error verifying access: %s", err)
@@ -200,22 +345,16 @@ class StredaApiClient:
     async def get_device_states(self) -> list[dict]:
         """Fetch all device states from the API."""
         if not self._api_token:
-            await self.verify_access()
+            await self.reauthenticate_if_needed()
 
         try:
-            async with async_timeout.timeout(10):
-                headers = {
-                    "Authorization": f"Bearer {self._api_token}",
-                    "Content-Type": "application/json",
-                }
+            async with self._session.get(
+                self._url_device_states, headers=self._headers, timeout=self._timeout
+            ) as response:
+                response.raise_for_status()
+                data = await _get_json(response)
 
-                url = f"{STREDA_DATA_API_URL}/DeviceState/{self._location_id}/deviceStates"
-
-                async with self._session.get(url, headers=headers) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    return data if isinstance(data, list) else []
+                return data if isinstance(data, list) else []
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Error fetching lights: %s", err)
@@ -225,38 +364,64 @@ class StredaApiClient:
             raise
 
     async def discover_system(self) -> list[dict]:
-        """Fetch all device discovery information from the API."""
+        """Fetch all device discovery information from the API.
+
+        Responses are cached by ETag, unchanged rooms and docks are answered
+        with a 304 and served from the cache.
+        """
         if not self._api_token:
-            await self.verify_access()
+            await self.reauthenticate_if_needed()
 
         try:
-            async with async_timeout.timeout(20):
-                headers = {
-                    "Authorization": f"Bearer {self._api_token}",
-                    "Content-Type": "application/json",
-                }
+            cache = self._discovery_cache
+            new_cache = {}
+
+            async def fetch(url):
+                cached = cache.get(url)
+                headers = self._headers
+                if cached:
+                    headers = {**self._headers, "If-None-Match": cached["etag"]}
 
-                async def fetch(url):
-                    async with self._session.get(url, headers=headers) as response:
-                        response.raise_for_status()
-                        return await response.json()
+                async with self._session.get(
+                    url, headers=headers, timeout=self._timeout
+                ) as response:
+                    if cached and response.status == 304:
+                        new_cache[url] = cached
+                        return cached["data"]
+
+                    response.raise_for_status()
+                    data = await _get_json(response)
+                    if etag := response.headers.get("ETag"):
+                        new_cache[url] = {"etag": etag, "data": data}
+                    return data
 
-                ROOMS_URL = f"https://streda-admin-production.azurewebsites.net/Room/{self._location_id}/getRooms"
-                rooms_data = await fetch(ROOMS_URL)
+            rooms_data = await fetch(self._url_rooms)
 
-                async def fetch_docks_for_room(room):
-                    docks_url = f"https://streda-admin-production.azurewebsites.net/Dock/{self._location_id}/{room.get('id')}/getDocks"
+            # Bound the fan-out so the pooled keep-alive connections get
+            # reused instead of opening a new connection per room
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+            async def fetch_docks_for_room(room):
+                docks_url = self._url_docks_template.format(room_id=room.get("id"))
+                async with semaphore:
                     docks = await fetch(docks_url)
-                    return {
-                        "room_id": room.get("id"),
-                        "room_name": room.get("name"),
-                        "docks": docks,
-                    }
-
-                results = await asyncio.gather(
-                    *(fetch_docks_for_room(room) for room in rooms_data)
-                )
-                return results
+                return {
+                    "room_id": room.get("id"),
+                    "room_name": room.get("name"),
+                    "docks": docks,
+                }
+
+            results = await asyncio.gather(
+                *(fetch_docks_for_room(room) for room in rooms_data)
+            )
+
+            # Only persist the cache when something changed
+            if new_cache != cache:
+                self._discovery_cache = new_cache
+                if self._discovery_cache_callback:
+                    await self._discovery_cache_callback(new_cache)
+
+            return results
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Error fetching system discovery: %s", err)
@@ -268,30 +433,15 @@ class StredaApiClient:
     async def toggle_light(self, dock_number: int, dock_device_number: int) -> bool:
         """Turn a light on or off."""
         try:
-            async with async_timeout.timeout(10):
-                headers = {
-                    "Authorization": f"Bearer {self._api_token}",
-                    "Content-Type": "application/json",
-                }
-
-                # Adjust endpoint and payload to match your API
-                url = (
-                    f"{STREDA_DATA_API_URL}/DeviceState/{self._location_id}/deviceState"
-                )
-                payload = {
-                    "action": "ActionSwitch",
-                    "actionParameters": {"switchAction": "TOGGLE"},
-                    "targetDevice": {
-                        "deviceNumber": dock_device_number,
-                        "dockNumber": f"{str(dock_number)}",
-                    },
-                }
-
-                async with self._session.post(
-                    url, headers=headers, json=payload
-                ) as response:
-                    response.raise_for_status()
-                    return True
+            # Adjust endpoint and payload to match your API
+            url = self._url_device_state
+            payload = (_TOGGLE_TEMPLATE % (dock_device_number, dock_number)).encode()
+
+            async with self._session.post(
+                url, headers=self._headers, data=payload, timeout=self._timeout
+            ) as response:
+                response.raise_for_status()
+                return True
 
         except aiohttp.ClientError as err:
             _LOGGER.error("Error setting light state: %s", err)
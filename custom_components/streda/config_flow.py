@@ -14,26 +14,22 @@ from .const import CONF_REFRESH_TOKEN, CONF_LOCATION_ID, DOMAIN
 _LOGGER = logging.getLogger(__name__)
 
 
+def _strip_prefix(raw_value: str, prefix: str) -> str:
+    """Accept plain values or prefix\"<value>\" format."""
+    if raw_value.startswith(prefix):
+        # Remove the prefix, whitespace and surrounding quotes
+        return raw_value.removeprefix(prefix).strip().strip('"')
+    return raw_value
+
+
 def _normalize_refresh_token(raw_token: str) -> str:
     """Accept plain tokens or secret:\"<TOKEN>\" format."""
-    if raw_token.startswith("secret:"):
-        token = raw_token[len("secret:") :].strip()
-        # Remove surrounding quotes if present
-        if token.startswith('"') and token.endswith('"'):
-            token = token[1:-1]
-        return token
-    return raw_token
+    return _strip_prefix(raw_token, "secret:")
 
 
 def _normalize_location_id(raw_token: str) -> str:
     """Accept plain id or locationId:\"<id>\" format."""
-    if raw_token.startswith("locationId:"):
-        token = raw_token[len("locationId:") :].strip()
-        # Remove surrounding quotes if present
-        if token.startswith('"') and token.endswith('"'):
-            token = token[1:-1]
-        return token
-    return raw_token
+    return _strip_prefix(raw_token, "locationId:")
 
 
 async def validate_input(hass: HomeAssistant, data: dict) -> dict:
@@ -1,15 +1,24 @@
 """Constants for the streda Lights integration."""
 
+import sys
+from types import MappingProxyType
+
 DOMAIN = "streda"
 VERSION = "0.2.1"
 
 # Configuration
 CONF_REFRESH_TOKEN = "refresh_token"
 CONF_LOCATION_ID = "location_id"
+CONF_DISCOVERY_CACHE = "discovery_cache"
 
 # Defaults
 FALLBACK_DATA_POLL_INTERVAL = 3600  # 1 hour
-ACCESS_TOKEN_VALIDITY_CHECK_INTERVAL = 1800  # 30 minutes
+TOKEN_REFRESH_MARGIN = 300  # refresh 5 minutes before the API token expires
+MIN_TOKEN_REFRESH_DELAY = 60  # 1 minute
+MAX_CONCURRENT_REQUESTS = 5  # parallel requests to the API during discovery
+SIGNALR_UPDATE_DEBOUNCE = 0.05  # seconds to collect a burst of SignalR updates
+SIGNALR_STOP_TIMEOUT = 2  # seconds
+OPTIMISTIC_STATE_TIMEOUT = 10  # seconds to wait for the SignalR echo of a toggle
 
 # API Endpoints
 CLIENT_ID = "ed1f77db-48fe-4a5e-8853-72929d971604"
@@ -33,7 +42,10 @@ STREDA_SIGNALR_HUB_URL = (
     "https://streda-signalr-production.service.signalr.net/client/?hub=realtimehub"
 )
 
-POSITION_DESCRIPTIONS = {
+# Dock codes of snap-ins with a relay, set up as switches
+RELAY_DOCK_CODES = frozenset({"BN1-C"})
+
+_POSITION_DESCRIPTIONS = {
     "cm": "Ceiling, center",
     "cn": "Ceiling, entry",
     "cf": "Ceiling, far side",
@@ -49,3 +61,8 @@ POSITION_DESCRIPTIONS = {
     "bwm": "Backside wall mid",
     "bwr": "Backside wall right",
 }
+
+# Read-only, with interned keys so lookups of interned codes compare by identity
+POSITION_DESCRIPTIONS = MappingProxyType(
+    {sys.intern(k): v for k, v in _POSITION_DESCRIPTIONS.items()}
+)
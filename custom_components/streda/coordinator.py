@@ -2,18 +2,89 @@
 
 import asyncio
 import logging
+import sys
+from dataclasses import dataclass
 from datetime import timedelta
 
 from homeassistant.core import HomeAssistant, callback
-from signalrcore.hub_connection_builder import HubConnectionBuilder
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .api import StredaApiClient
-from .const import DOMAIN, STREDA_SIGNALR_HUB_URL
+from .const import (
+    DOMAIN,
+    SIGNALR_STOP_TIMEOUT,
+    SIGNALR_UPDATE_DEBOUNCE,
+    STREDA_SIGNALR_HUB_URL,
+)
+from .signalr import SignalRClient
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _intern(value):
+    """Intern strings, leave anything else untouched."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _project_state(state: dict) -> dict:
+    """Keep only the type and data of a state."""
+    data = state.get("data") or {}
+    if "state" in data:
+        data["state"] = _intern(data["state"])
+    return {"type": _intern(state.get("type")), "data": data}
+
+
+def _project(snap_in: dict) -> dict:
+    """Keep only the SnapIn fields the integration reads, with interned strings."""
+    return {
+        "zigbeeId": _intern(snap_in["zigbeeId"]),
+        "states": [_project_state(s) for s in snap_in.get("states", [])],
+        "devices": [
+            {
+                "deviceNumber": device.get("deviceNumber"),
+                "deviceType": _intern(device.get("deviceType")),
+                "states": [_project_state(s) for s in device.get("states", [])],
+            }
+            for device in snap_in.get("devices", [])
+        ],
+    }
+
+
+def _reindex_snapin(snap_in: dict) -> None:
+    """Attach lookup indexes for the devices and states of a SnapIn."""
+    snap_in["_states_by_type"] = {s.get("type"): s for s in snap_in.get("states", [])}
+    snap_in["_devices_by_number"] = {
+        d.get("deviceNumber"): d for d in snap_in.get("devices", [])
+    }
+    snap_in["_devices_by_type"] = {
+        d.get("deviceType"): d for d in snap_in.get("devices", [])
+    }
+    for device in snap_in.get("devices", []):
+        device["_states_by_type"] = {s.get("type"): s for s in device.get("states", [])}
+
+
+@dataclass(slots=True, frozen=True)
+class CoordinatorData:
+    """Device states of the location, indexed by SnapIn zigbeeId."""
+
+    device_states: list[dict]
+    by_zigbee: dict[str, dict]
+
+
+def _build_data(device_states: list[dict]) -> CoordinatorData:
+    """Project and index the device states returned by the API."""
+    device_states = [
+        _project(snap_in) for snap_in in device_states if snap_in.get("zigbeeId")
+    ]
+    for snap_in in device_states:
+        _reindex_snapin(snap_in)
+    return CoordinatorData(
+        device_states=device_states,
+        by_zigbee={snap_in["zigbeeId"]: snap_in for snap_in in device_states},
+    )
+
+
 class DataCoordinator(DataUpdateCoordinator):
     """Coordinator to setup the SignalR connection and manage as backup fetching data from the API."""
 
@@ -26,7 +97,12 @@ class DataCoordinator(DataUpdateCoordinator):
     ):
         """Initialize the coordinator."""
         self.api_client = api_client
-        self.hub_connection = None
+        self.hub_connection: SignalRClient | None = None
+        self._signalr_task: asyncio.Task | None = None
+        self._pending_updates: list[dict] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._closed = False
+        self._hub_opened = False
         self.location_id = location_id
 
         super().__init__(
@@ -39,162 +115,194 @@ class DataCoordinator(DataUpdateCoordinator):
     async def _async_update_data(self):
         """Check token validity and fetch data from API."""
         try:
-            device_states = await self.api_client.get_device_states()
-            self.async_set_updated_data({"device_states": device_states})
-            return self.data or {"device_states": []}
+            # The base class stores the result and notifies the entities
+            return _build_data(await self.api_client.get_device_states())
         except Exception as err:
             raise UpdateFailed(
                 f"Error refreshing b2c token or api token: {err}"
             ) from err
 
     async def async_start_signalr(self):
-        """Start SignalR connection."""
-        try:
-            # Get initial data
-            device_states = await self.api_client.get_device_states()
-            self.async_set_updated_data({"device_states": device_states})
-
-            # Build SignalR connection
-            signalr_access_token = await self.api_client.get_signalr_access_token()
-            self.hub_connection = (
-                HubConnectionBuilder()
-                .with_url(
-                    STREDA_SIGNALR_HUB_URL,
-                    options={
-                        "access_token_factory": lambda: signalr_access_token,
-                    },
-                )
-                .with_automatic_reconnect(
-                    {
-                        "type": "interval",
-                        "intervals": [0, 2, 10, 30],  # Reconnect intervals in seconds
-                    }
-                )
-                .build()
-            )
-
-            # Register event handlers
-            self.hub_connection.on_open(self._on_signalr_open)
-            self.hub_connection.on_close(self._on_signalr_close)
-            self.hub_connection.on_error(self._on_signalr_error)
-
-            # Register message handlers for device updates
-            self.hub_connection.on(
-                "deviceStateNotification",
-                lambda data: self.hass.loop.call_soon_threadsafe(
-                    self._handle_device_update, data
-                ),
-            )
-
-            # Start connection in background
-            await self.hass.async_add_executor_job(self.hub_connection.start)
-            _LOGGER.info("SignalR connection started successfully")
+        """Start SignalR connection.
 
+        The updates are applied to the device states of the first refresh,
+        so nothing is fetched here.
+        """
+        try:
+            self._connect_hub()
         except Exception as err:
             _LOGGER.error(f"Failed to start SignalR connection: {err}")
             raise
 
+    @callback
+    def _connect_hub(self):
+        """Build the SignalR connection and run it in the background."""
+        self.hub_connection = SignalRClient(
+            async_get_clientsession(self.hass),
+            STREDA_SIGNALR_HUB_URL,
+            self.api_client.get_signalr_access_token,
+            reconnect_intervals=(0, 2, 10, 30),  # Reconnect intervals in seconds
+        )
+
+        # Register event handlers
+        self.hub_connection.on_open(self._on_signalr_open)
+        self.hub_connection.on_close(self._on_signalr_close)
+
+        # Register message handlers for device updates
+        self.hub_connection.on("deviceStateNotification", self._handle_device_update)
+
+        # Run connection in background
+        self._signalr_task = self.hass.async_create_background_task(
+            self.hub_connection.run(), f"{DOMAIN} SignalR connection"
+        )
+        _LOGGER.info("SignalR connection started successfully")
+
     async def _reconnect_signalr(self):
         """Reconnect SignalR with fresh token."""
         try:
             # Stop existing connection
-            if self.hub_connection:
-                await self.hass.async_add_executor_job(self.hub_connection.stop)
-                self._signalr_connected = False
+            await self.async_stop_signalr()
 
             # Wait a moment
             await asyncio.sleep(1)
 
+            # The entry may have been unloaded while the old connection closed
+            if self._closed:
+                return
+
             # Start new connection with fresh token
-            await self.async_start_signalr()
+            self._connect_hub()
 
         except Exception as err:
             _LOGGER.error(f"Failed to reconnect SignalR: {err}")
 
-    @callback
-    def _on_signalr_open(self):
+    async def _on_signalr_open(self):
         """Handle SignalR connection opened."""
-        _LOGGER.info("SignalR connection opened")
-        self.hub_connection.send(
+        await self.hub_connection.send(
             "SubscribeDeviceStatesForLocationAsync", [self.location_id]
         )
 
+        # Every open after the first follows a gap without a connection, be it
+        # a dropped connection or a token refresh. Catch up on the updates
+        # missed meanwhile, the ones received from here on apply on top.
+        if self._hub_opened:
+            await self.async_request_refresh()
+        self._hub_opened = True
+
     @callback
     def _on_signalr_close(self):
         """Handle SignalR connection closed."""
         _LOGGER.warning("SignalR connection closed")
 
     @callback
-    def _on_signalr_error(self, data):
-        """Handle SignalR errors."""
-        _LOGGER.error(f"SignalR error: {data}")
+    def _handle_device_update(self, message):
+        """Queue device updates from SignalR, bursts are applied together."""
+        # Runs in the SignalR receive loop, raising here drops the connection
+        if isinstance(message, dict):
+            self._pending_updates.append(message)
+        elif isinstance(message, list):
+            self._pending_updates.extend(message)
+        else:
+            _LOGGER.warning("Ignoring malformed device update: %s", message)
+            return
+
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                SIGNALR_UPDATE_DEBOUNCE, self._flush_device_updates
+            )
 
     @callback
-    def _handle_device_update(self, message):
-        """Handle general device updates from SignalR."""
+    def _flush_device_updates(self):
+        """Apply the queued SignalR updates and notify entities once."""
+        updates, self._pending_updates = self._pending_updates, []
+        self._flush_handle = None
         try:
-            # Similar logic to _handle_device_state_change
-            current_data = self.data.get("device_states", [])
-
-            # Find and update the device
-            self.apply_signalr_updates(current_data, message)
+            # Find and update the device, entities only need to know about
+            # actual changes
+            if not self.apply_signalr_updates(self.data, updates):
+                return
 
-            # Trigger update to all entities
-            self.async_set_updated_data({"device_states": current_data})
+            # Updates are applied in place, so the index is still current
+            self.async_set_updated_data(self.data)
         except Exception as err:
             _LOGGER.error(f"Error handling device update: {err}")
 
     async def async_stop_signalr(self):
         """Stop SignalR connection."""
-        if self.hub_connection:
-            try:
-                await self.hass.async_add_executor_job(self.hub_connection.stop)
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+            self._pending_updates = []
+
+        if self._signalr_task:
+            # Don't let a hanging websocket close stall unloading or shutdown
+            self._signalr_task.cancel()
+            done, _ = await asyncio.wait(
+                {self._signalr_task}, timeout=SIGNALR_STOP_TIMEOUT
+            )
+            if done:
                 _LOGGER.info("SignalR connection stopped")
-            except Exception as err:
-                _LOGGER.error(f"Error stopping SignalR: {err}")
-            finally:
-                self.hub_connection = None
+            else:
+                _LOGGER.warning("SignalR stop timed out")
+            self._signalr_task = None
+            self.hub_connection = None
+
+    async def async_shutdown(self) -> None:
+        """Stop SignalR for good, token refreshes must not reconnect it."""
+        self._closed = True
+        await self.async_stop_signalr()
+        await super().async_shutdown()
 
     def apply_signalr_updates(
-        self, full_state: list[dict], updates: list[dict]
-    ) -> None:
+        self, data: CoordinatorData, updates: list[dict] | dict
+    ) -> bool:
         """
-        Mutates full_state by applying SignalR updates.
+        Mutates the device states in data by applying SignalR updates.
+
+        Returns whether any state actually changed.
         """
+        # A notification can carry a single update instead of a list
+        if isinstance(updates, dict):
+            updates = (updates,)
+        if not updates or not data.device_states:
+            return False
+
+        changed = False
 
-        # Index SnapIns by zigbeeId
-        snapin_index = {}
-        for snapin in full_state:
-            zigbee_id = snapin.get("zigbeeId")
-            if zigbee_id:
-                snapin_index[zigbee_id] = snapin
+        # SnapIns are indexed by zigbeeId whenever the device states are set
+        snapin_index = data.by_zigbee
 
         for update in updates:
+            # Skip malformed updates one by one, the rest of the batch still applies
+            if not isinstance(update, dict):
+                continue
+
             zigbee_id = update.get("zigbeeId")
             device_number = update.get("deviceNumber")
             device_state = update.get("deviceState")
 
-            if not (zigbee_id and device_state):
+            if not (zigbee_id and isinstance(device_state, dict)):
                 continue
 
             snapin = snapin_index.get(zigbee_id)
             if not snapin:
                 continue
 
-            # Index devices for this SnapIn
-            devices = snapin.get("devices", [])
-            device = next(
-                (d for d in devices if d.get("deviceNumber") == device_number), None
-            )
+            device = snapin["_devices_by_number"].get(device_number)
             if not device:
                 continue
 
             state_type = device_state.get("type")
-            state_data = device_state.get("data", {})
+            state_data = device_state.get("data")
+            if not isinstance(state_data, dict):
+                continue
 
-            # Find or create state
-            for state in device.get("states", []):
-                if state.get("type") == state_type:
-                    state["data"].update(state_data)
-                    break
-            return
+            # States are patched in place, so the indexes stay valid
+            state = device["_states_by_type"].get(state_type)
+            if state and any(
+                state["data"].get(key) != value for key, value in state_data.items()
+            ):
+                state["data"].update(state_data)
+                changed = True
+
+        return changed
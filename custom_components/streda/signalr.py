@@ -0,0 +1,181 @@
+"""Asyncio SignalR client for the streda realtime hub."""
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+
+import aiohttp
+from yarl import URL
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson ships with Home Assistant, but stay portable
+    from json import loads as json_loads
+
+_LOGGER = logging.getLogger(__name__)
+
+RECORD_SEPARATOR = "\x1e"
+HANDSHAKE = json.dumps({"protocol": "json", "version": 1}) + RECORD_SEPARATOR
+
+# SignalR hub protocol message types
+INVOCATION = 1
+PING = 6
+CLOSE = 7
+
+PING_INTERVAL = 15  # seconds, the hub drops clients that stay silent for 30
+
+# Same limits as the API requests, a hung negotiate must not stall reconnecting
+NEGOTIATE_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=8)
+CONNECT_TIMEOUT = 10  # seconds for the websocket upgrade
+
+
+class SignalRClient:
+    """Client for the SignalR JSON hub protocol over a websocket.
+
+    Runs on the event loop, so hub messages are dispatched to the handlers
+    directly instead of hopping over from a websocket thread.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        hub_url: str,
+        access_token_factory: Callable[[], Awaitable[str]],
+        reconnect_intervals: tuple[int, ...],
+    ):
+        """Initialize the client."""
+        self._session = session
+        self._hub_url = URL(hub_url)
+        self._access_token_factory = access_token_factory
+        self._reconnect_intervals = reconnect_intervals
+        self._handlers: dict[str, Callable[[list], None]] = {}
+        self._on_open: Callable[[], Awaitable[None]] | None = None
+        self._on_close: Callable[[], None] | None = None
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+
+    def on(self, target: str, handler: Callable[[list], None]) -> None:
+        """Register a handler for invocations of a hub method."""
+        self._handlers[target] = handler
+
+    def on_open(self, handler: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine to run after every successful handshake."""
+        self._on_open = handler
+
+    def on_close(self, handler: Callable[[], None]) -> None:
+        """Register a callback for when the connection is lost."""
+        self._on_close = handler
+
+    async def send(self, target: str, arguments: list) -> None:
+        """Invoke a hub method without waiting for its result."""
+        if self._ws is None or self._ws.closed:
+            raise ConnectionError("SignalR connection is not open")
+        await self._send_message(
+            {"type": INVOCATION, "target": target, "arguments": arguments}
+        )
+
+    async def run(self) -> None:
+        """Keep the connection open, reconnecting until cancelled."""
+        attempt = 0
+        while True:
+            try:
+                if await self._connect():
+                    attempt = 0
+            except Exception as err:
+                _LOGGER.error("SignalR error: %s", err)
+            finally:
+                self._ws = None
+
+            delay = self._reconnect_intervals[
+                min(attempt, len(self._reconnect_intervals) - 1)
+            ]
+            attempt += 1
+            _LOGGER.debug("Reconnecting SignalR in %d seconds", delay)
+            await asyncio.sleep(delay)
+
+    async def _connect(self) -> bool:
+        """Negotiate, connect and dispatch messages until the connection closes.
+
+        Returns whether the handshake succeeded.
+        """
+        headers = {"Authorization": f"Bearer {await self._access_token_factory()}"}
+
+        negotiate_url = self._hub_url.with_path(
+            self._hub_url.path.rstrip("/") + "/negotiate"
+        ).with_query({**self._hub_url.query, "negotiateVersion": "1"})
+        async with self._session.post(
+            negotiate_url, headers=headers, timeout=NEGOTIATE_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+            negotiation = json_loads(await response.read())
+
+        connection_id = negotiation.get("connectionToken") or negotiation.get(
+            "connectionId"
+        )
+        ws_url = self._hub_url.with_scheme(
+            self._hub_url.scheme.replace("http", "ws")
+        ).update_query(id=connection_id)
+
+        # The heartbeat closes a half-open connection whose server went away,
+        # the receive loop would otherwise wait forever
+        async with asyncio.timeout(CONNECT_TIMEOUT):
+            ws = await self._session.ws_connect(
+                ws_url, headers=headers, heartbeat=PING_INTERVAL
+            )
+
+        async with ws:
+            self._ws = ws
+            await ws.send_str(HANDSHAKE)
+
+            handshake_done = False
+            pinger = None
+            try:
+                async for msg in ws:
+                    if msg.type != aiohttp.WSMsgType.TEXT:
+                        break
+
+                    for frame in msg.data.split(RECORD_SEPARATOR):
+                        if not frame:
+                            continue
+                        message = json_loads(frame)
+
+                        if not handshake_done:
+                            if error := message.get("error"):
+                                raise ValueError(f"Handshake rejected: {error}")
+                            handshake_done = True
+                            pinger = asyncio.create_task(self._ping())
+                            _LOGGER.info("SignalR connection opened")
+                            if self._on_open:
+                                await self._on_open()
+                            continue
+
+                        msg_type = message.get("type")
+                        if msg_type == INVOCATION:
+                            handler = self._handlers.get(message.get("target"))
+                            if handler:
+                                handler(message.get("arguments", []))
+                        elif msg_type == CLOSE:
+                            if error := message.get("error"):
+                                _LOGGER.error("SignalR closed by server: %s", error)
+                            return handshake_done
+            finally:
+                if pinger:
+                    pinger.cancel()
+                if handshake_done and self._on_close:
+                    self._on_close()
+
+        return handshake_done
+
+    async def _ping(self) -> None:
+        """Keep the connection alive while no invocations are sent."""
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            try:
+                await self._send_message({"type": PING})
+            except (ConnectionError, aiohttp.ClientError):
+                # The receive loop notices the closed connection
+                return
+
+    async def _send_message(self, message: dict) -> None:
+        """Send a single hub protocol message."""
+        await self._ws.send_str(json.dumps(message) + RECORD_SEPARATOR)
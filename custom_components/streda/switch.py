@@ -1,16 +1,25 @@
 """Switch platform for Smart Plug integration."""
 
 import logging
+import sys
 from typing import Any
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, POSITION_DESCRIPTIONS
+from .const import (
+    DOMAIN,
+    OPTIMISTIC_STATE_TIMEOUT,
+    POSITION_DESCRIPTIONS,
+    RELAY_DOCK_CODES,
+)
 from .coordinator import DataCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -29,13 +38,46 @@ async def async_setup_entry(
     # Get devices from coordinator data
     system = hass.data[DOMAIN][entry.entry_id]["system"]
 
+    # Firmware version and relay device number per SnapIn, in a single pass
+    snap_in_info = {}
+    for zigbee_id, snap_in in data_coordinator.data.by_zigbee.items():
+        firmware_state = snap_in["_states_by_type"].get("FirmwareState")
+        relay = snap_in["_devices_by_type"].get("RelayBin")
+        snap_in_info[zigbee_id] = (
+            firmware_state["data"].get("firmwareVersion", "unknown")
+            if firmware_state
+            else "unknown",
+            relay["deviceNumber"] if relay else None,
+        )
+
     entities = []
     for room in system:
         for dock in room.get("docks", []):
             # only add lights for now.
-            if dock.get("dockCode") != "BN1-C":
+            if dock.get("dockCode") not in RELAY_DOCK_CODES:
                 continue
-            entities.append(RelayBin(data_coordinator, room, dock))
+            entities.append(
+                RelayBin(
+                    data_coordinator, room, dock, snap_in_info.get(dock.get("zigbeeId"))
+                )
+            )
+
+    # Entities used to be registered before their relay number was known,
+    # move those over to the new unique_id so they keep their entity_id
+    entity_registry = er.async_get(hass)
+    for entity in entities:
+        old_unique_id = f"{DOMAIN}_{entity._snap_in_id}_relay_None"
+        if entity.unique_id == old_unique_id or entity_registry.async_get_entity_id(
+            Platform.SWITCH, DOMAIN, entity.unique_id
+        ):
+            continue
+        if entity_id := entity_registry.async_get_entity_id(
+            Platform.SWITCH, DOMAIN, old_unique_id
+        ):
+            _LOGGER.debug("Migrating %s to unique_id %s", entity_id, entity.unique_id)
+            entity_registry.async_update_entity(
+                entity_id, new_unique_id=entity.unique_id
+            )
 
     _LOGGER.info("Setting up %d switch entities", len(entities))
     async_add_entities(entities)
@@ -45,16 +87,22 @@ class RelayBin(CoordinatorEntity, SwitchEntity):
     """Representation of a Smart Plug Socket."""
 
     def __init__(
-        self, data_coordinator: DataCoordinator, room_data: dict, dock_data: dict
+        self,
+        data_coordinator: DataCoordinator,
+        room_data: dict,
+        dock_data: dict,
+        snap_in_info: tuple[str, int | None] | None,
     ) -> None:
         """Initialize the socket."""
         super().__init__(data_coordinator)
 
+        # Firmware version and device number
+        firmware_version, self._dock_device_number = snap_in_info or ("unknown", None)
+
         # Dock information
         self._zigbee_id = dock_data.get("zigbeeId")
         self._snap_in_id = dock_data.get("snapInId")
         self._dock_number = dock_data.get("number")
-        self._dock_device_number = None  # to be filled later
 
         # Room information
         self._room_name = room_data.get("room_name", "Unknown")
@@ -66,57 +114,85 @@ class RelayBin(CoordinatorEntity, SwitchEntity):
             f"{DOMAIN}_{self._snap_in_id}_relay_{self._dock_device_number}"
         )
 
-        # Firmware version and device number
-        devices = self.coordinator.data.get("device_states", [])
-        for snap_in in devices:
-            if snap_in.get("zigbeeId") == self._zigbee_id:
-                # Firmware version snap in
-                firmware_state = next(
-                    (
-                        state
-                        for state in snap_in.get("states", [])
-                        if state.get("type") == "FirmwareState"
-                    ),
-                    None,
-                )
-                if firmware_state:
-                    firmware_version = firmware_state.get("data", {}).get(
-                        "firmwareVersion", "unknown"
-                    )
-                # device number in dock
-                for device in snap_in.get("devices", []):
-                    if device.get("deviceType") == "RelayBin":
-                        self._dock_device_number = device.get("deviceNumber")
-                break
-
         # Device info - this groups entities together
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self._snap_in_id)},
-            name=f"{self._room_name} {POSITION_DESCRIPTIONS.get(dock_data.get('positionId', ''), '')}",
+            name=f"{self._room_name} {POSITION_DESCRIPTIONS.get(sys.intern(dock_data.get('positionId') or ''), '')}",
             manufacturer="Isolectra",
             model="Ceiling mounted snap-in",
             sw_version=firmware_version,
         )
 
-    @property
-    def snap_in_data(self) -> dict:
-        """Get current socket data from coordinator."""
-        devices = self.coordinator.data.get("device_states", [])
-        for snap_in in devices:
-            if snap_in.get("zigbeeId") == self._zigbee_id:
-                return snap_in
-        return {}
+        # State set on user action until the SignalR echo confirms it, or
+        # until it goes stale because no echo arrived
+        self._optimistic_state: bool | None = None
+        self._cancel_optimistic_timeout = None
+        self._update_from_coordinator()
+
+    def _update_from_coordinator(self) -> None:
+        """Bind the SnapIn and relay device and cache the power state.
+
+        SignalR updates mutate these dicts in place, a full refresh replaces
+        them, so they are bound again on every coordinator update.
+        """
+        self._snap_in = self.coordinator.data.by_zigbee.get(self._zigbee_id, {})
+        self._device = self._snap_in.get("_devices_by_number", {}).get(
+            self._dock_device_number, {}
+        )
+        power_state = self._device.get("_states_by_type", {}).get("PowerState")
+        self._cached_is_on = (
+            power_state is not None and power_state["data"].get("state") == "ON"
+        )
+        if self._optimistic_state == self._cached_is_on:
+            self._clear_optimistic_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_from_coordinator()
+        super()._handle_coordinator_update()
+
+    @callback
+    def _clear_optimistic_state(self) -> None:
+        """Drop the optimistic state and its timeout."""
+        self._optimistic_state = None
+        if self._cancel_optimistic_timeout:
+            self._cancel_optimistic_timeout()
+            self._cancel_optimistic_timeout = None
+
+    @callback
+    def _set_optimistic_state(self, state: bool | None) -> None:
+        """Show state until the echo confirms it or its timeout expires."""
+        self._clear_optimistic_state()
+        # The reported state needs no optimistic state
+        if state is not None and state != self._cached_is_on:
+            self._optimistic_state = state
+            self._cancel_optimistic_timeout = async_call_later(
+                self.hass, OPTIMISTIC_STATE_TIMEOUT, self._expire_optimistic_state
+            )
+
+    @callback
+    def _expire_optimistic_state(self, _now) -> None:
+        """Fall back to the reported state when no echo confirmed the toggle.
+
+        Unchanged states don't notify the entities, so a relay that didn't
+        switch would otherwise keep showing the optimistic state.
+        """
+        self._cancel_optimistic_timeout = None
+        self._optimistic_state = None
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the optimistic state timeout."""
+        self._clear_optimistic_state()
+        await super().async_will_remove_from_hass()
 
     @property
     def is_on(self) -> bool:
         """Return true if socket is on."""
-        snap_in = self.snap_in_data
-        for device in snap_in.get("devices", []):
-            if device.get("deviceType") == "RelayBin":
-                for state in device.get("states", []):
-                    if state.get("type") == "PowerState":
-                        state = state.get("data").get("state")
-        return state == "ON"
+        if self._optimistic_state is not None:
+            return self._optimistic_state
+        return self._cached_is_on
 
     @property
     def icon(self):
@@ -124,18 +200,31 @@ class RelayBin(CoordinatorEntity, SwitchEntity):
             return "mdi:ceiling-light"
         return "mdi:ceiling-light-outline"
 
-    async def toggle(self, **kwargs: Any) -> None:
-        """Turn the socket on."""
-        await self.coordinator.api_client.toggle_light(
+    async def toggle(self, **kwargs: Any) -> bool:
+        """Toggle the socket, return whether the request succeeded."""
+        return await self.coordinator.api_client.toggle_light(
             self._dock_number, self._dock_device_number
         )
 
+    async def _async_set_state(self, turn_on: bool) -> None:
+        """Toggle the socket if needed and show the new state right away."""
+        if self.is_on == turn_on:
+            return
+
+        # Set before the request goes out, a command arriving while it is in
+        # flight must see the new state or it would toggle the relay back
+        previous_state = self._optimistic_state
+        self._set_optimistic_state(turn_on)
+        self.async_write_ha_state()
+
+        if not await self.toggle():
+            self._set_optimistic_state(previous_state)
+            self.async_write_ha_state()
+
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the socket on."""
-        if not self.is_on:
-            await self.toggle()
+        await self._async_set_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the socket off."""
-        if self.is_on:
-            await self.toggle()
+        await self._async_set_state(False)